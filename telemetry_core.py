@@ -0,0 +1,166 @@
+"""Pipeline de processamento do log de telemetria, compartilhado pelas páginas do app."""
+import math
+import streamlit as st
+import pandas as pd
+import numpy as np
+from streamlit.runtime.uploaded_file_manager import UploadedFile
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Raio da Terra em metros
+EARTH_RADIUS_METERS = 6371000
+
+@st.cache_data(show_spinner=False, max_entries=10, hash_funcs={UploadedFile: lambda f: f.getvalue()})
+def load_data(uploaded_file) -> pd.DataFrame:
+    """Carrega os dados do log de telemetria."""
+    try:
+        required_cols = ['lat', 'lng', 'vel']
+        # Lê apenas as colunas usadas, já com o tipo definido, sem inferência.
+        # Tudo em float64: em float32 lat/lng têm resolução de ~0,5 m e vel
+        # aparece com ruído nos tooltips (43.3 vira 43.29999923706055).
+        df = pd.read_csv(
+            uploaded_file, usecols=lambda col: col in required_cols,
+            dtype={col: np.float64 for col in required_cols}, engine='c'
+        )
+        if not all(col in df.columns for col in required_cols):
+            st.error(f"O arquivo CSV deve conter as colunas: {required_cols}")
+            return pd.DataFrame()
+        return df
+    except Exception as e:
+        st.error(f"Erro ao ler o arquivo: {e}")
+        return pd.DataFrame()
+
+def calculate_haversine_distance(lat1, lon1, lat2, lon2):
+    """Calcula a distância em metros entre pontos (Haversine), aceitando escalares ou arrays."""
+    lat1_rad, lon1_rad, lat2_rad, lon2_rad = map(np.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2_rad - lat1_rad
+    dlat *= 0.5
+    a = np.sin(dlat)
+    a *= a
+    dlon = lon2_rad - lon1_rad
+    dlon *= 0.5
+    b = np.sin(dlon)
+    b *= b
+    b *= np.cos(lat1_rad)
+    b *= np.cos(lat2_rad)
+    a += b
+    c = np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    c *= 2 * EARTH_RADIUS_METERS
+    return c
+
+def calculate_bearing(lat1, lon1, lat2, lon2):
+    """Calcula o rolamento (direção) em graus de um ponto para outro, aceitando escalares ou arrays."""
+    lat1_rad, lon1_rad, lat2_rad, lon2_rad = map(np.radians, [lat1, lon1, lat2, lon2])
+    dLon = lon2_rad - lon1_rad
+    x = np.cos(lat2_rad) * np.sin(dLon)
+    y = np.cos(lat1_rad) * np.sin(lat2_rad) - np.sin(lat1_rad) * np.cos(lat2_rad) * np.cos(dLon)
+    bearing_rad = np.arctan2(x, y)
+    bearing_deg = (np.degrees(bearing_rad) + 360) % 360
+    return bearing_deg
+
+def calculate_track_geo(lat, lng):
+    """Calcula distância (m) e rolamento (graus) entre pontos consecutivos de uma rota.
+
+    Cada ponto é o destino de um trecho e a origem do seguinte, então seno e
+    cosseno de cada latitude/longitude são calculados uma única vez e
+    reaproveitados pelas fatias [:-1] e [1:]. O primeiro ponto recebe zero.
+    """
+    lat_rad = np.radians(lat)
+    lng_rad = np.radians(lng)
+    sin_lat, cos_lat = np.sin(lat_rad), np.cos(lat_rad)
+    sin_lng, cos_lng = np.sin(lng_rad), np.cos(lng_rad)
+    sin_lat1, sin_lat2 = sin_lat[:-1], sin_lat[1:]
+    cos_lat1, cos_lat2 = cos_lat[:-1], cos_lat[1:]
+    # sin(b - a) = sin(b)cos(a) - cos(b)sin(a); cos(b - a) = cos(b)cos(a) + sin(b)sin(a)
+    sin_dlon = sin_lng[1:] * cos_lng[:-1]
+    sin_dlon -= cos_lng[1:] * sin_lng[:-1]
+    cos_dlon = cos_lng[1:] * cos_lng[:-1]
+    cos_dlon += sin_lng[1:] * sin_lng[:-1]
+    # Haversine; os meios-ângulos são calculados diretamente porque
+    # 1 - cos perde toda a precisão nas distâncias curtas entre amostras
+    half_dlat = lat_rad[1:] - lat_rad[:-1]
+    half_dlat *= 0.5
+    a = np.sin(half_dlat)
+    a *= a
+    half_dlon = lng_rad[1:] - lng_rad[:-1]
+    half_dlon *= 0.5
+    b = np.sin(half_dlon)
+    b *= b
+    b *= cos_lat1
+    b *= cos_lat2
+    a += b
+    distance = np.zeros(len(lat_rad))
+    np.arctan2(np.sqrt(a), np.sqrt(1 - a), out=distance[1:])
+    distance *= 2 * EARTH_RADIUS_METERS
+    # Rolamento
+    x = cos_lat2 * sin_dlon
+    y = cos_lat1 * sin_lat2
+    y -= sin_lat1 * cos_lat2 * cos_dlon
+    bearing = np.zeros(len(lat_rad))
+    np.arctan2(x, y, out=bearing[1:])
+    bearing = (np.degrees(bearing) + 360) % 360
+    return distance, bearing
+
+if NUMBA_AVAILABLE:
+    # fastmath sem nnan/ninf: células lat/lng em branco chegam aqui como NaN
+    @njit(parallel=True, fastmath={'contract', 'afn', 'reassoc'}, cache=True)
+    def track_geo_kernel(lat, lng, dist_out, bear_out):
+        """Versão compilada de calculate_track_geo: preenche dist_out e bear_out trecho a trecho, em paralelo."""
+        dist_out[0] = 0.0
+        bear_out[0] = 0.0
+        for i in prange(1, lat.shape[0]):
+            # math.* em vez de np.*: o Numba mapeia direto para intrínsecos do LLVM
+            lat1_rad = math.radians(lat[i - 1])
+            lat2_rad = math.radians(lat[i])
+            dlon = math.radians(lng[i] - lng[i - 1])
+            sin_lat1, cos_lat1 = math.sin(lat1_rad), math.cos(lat1_rad)
+            sin_lat2, cos_lat2 = math.sin(lat2_rad), math.cos(lat2_rad)
+            s_dlat = math.sin((lat2_rad - lat1_rad) * 0.5)
+            s_dlon = math.sin(dlon * 0.5)
+            a = s_dlat * s_dlat + cos_lat1 * cos_lat2 * s_dlon * s_dlon
+            dist_out[i] = 2 * EARTH_RADIUS_METERS * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+            x = cos_lat2 * math.sin(dlon)
+            y = cos_lat1 * sin_lat2 - sin_lat1 * cos_lat2 * math.cos(dlon)
+            bear_out[i] = (math.degrees(math.atan2(x, y)) + 360) % 360
+
+@st.cache_data(show_spinner=False, max_entries=10)
+def process_telemetry_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Calcula o tempo decorrido e a aceleração."""
+    if df.empty: return pd.DataFrame()
+    lat = df['lat'].to_numpy()
+    lng = df['lng'].to_numpy()
+    vel_mps = df['vel'].to_numpy() / 3.6
+    if NUMBA_AVAILABLE:
+        delta_distance_m = np.empty(len(lat))
+        bearing = np.empty(len(lat))
+        track_geo_kernel(lat, lng, delta_distance_m, bearing)
+    else:
+        delta_distance_m, bearing = calculate_track_geo(lat, lng)
+    # Grandezas entre pontos consecutivos por fatias [1:] / [:-1]; o primeiro ponto fica em zero
+    avg_vel_mps = np.zeros(len(lat))
+    np.add(vel_mps[1:], vel_mps[:-1], out=avg_vel_mps[1:])
+    avg_vel_mps *= 0.5
+    delta_v_mps = np.zeros(len(lat))
+    np.subtract(vel_mps[1:], vel_mps[:-1], out=delta_v_mps[1:])
+    # Divide apenas onde o denominador é positivo; o restante fica em zero
+    delta_t_s = np.zeros(len(lat))
+    np.divide(delta_distance_m, avg_vel_mps, out=delta_t_s, where=avg_vel_mps > 1e-6)
+    # Como no Series.cumsum: trechos sem coordenada (NaN) não interrompem a soma,
+    # mas o próprio ponto continua NaN
+    missing = np.isnan(delta_t_s)
+    delta_t_s[missing] = 0.0
+    time_s = np.empty_like(delta_t_s)
+    np.cumsum(delta_t_s, out=time_s)
+    time_s[missing] = np.nan
+    acceleration_mpss = np.zeros(len(lat))
+    np.divide(delta_v_mps, delta_t_s, out=acceleration_mpss, where=delta_t_s > 1e-6)
+    return pd.DataFrame({
+        'lat': lat, 'lng': lng, 'vel': df['vel'].to_numpy(),
+        'time_s': time_s, 'acceleration_mpss': acceleration_mpss,
+        'bearing': bearing, 'icon': 'arrow',
+    })